@@ -0,0 +1,253 @@
+import heapq
+import json
+import os
+import threading
+from collections import defaultdict
+
+# Fields that can be queried through /api/analytics
+INDEX_FIELDS = ("port", "missing_header", "failed_rule", "server", "technology", "asn", "isp", "domain")
+
+# Bump when extract_keys() changes so journaled entries are rebuilt
+INDEX_VERSION = 2
+
+HEADER_ALIASES = {
+    "hsts": "strict-transport-security",
+    "csp": "content-security-policy",
+}
+
+
+def normalize(field, value):
+    value = str(value).strip().lower()
+    if field == "missing_header":
+        return HEADER_ALIASES.get(value, value)
+    if field == "asn":
+        # "AS16509 Amazon.com, Inc." / "16509" -> "as16509"
+        value = value.split()[0] if value else value
+        return value if value.startswith("as") else "as" + value
+    return value
+
+
+def extract_keys(data):
+    """Return {field: [values]} of index keys for one scan report."""
+    keys = defaultdict(set)
+    findings = data.get("findings") or {}
+    geo = data.get("geo_intel") or {}
+
+    for p in data.get("open_ports") or []:
+        keys["port"].add(str(p.get("port")))
+
+    # Without a fetched page there are no headers to judge, only unknowns
+    page_fetched = bool(findings.get("http_headers")) and data.get("target_ip") != "Resolution Failed"
+    if page_fetched:
+        audit = findings.get("security_header_audit") or {}
+        for header in ("Strict-Transport-Security", "Content-Security-Policy"):
+            if audit.get(header, "MISSING") == "MISSING":
+                keys["missing_header"].add(normalize("missing_header", header))
+        for rule_id, result in (findings.get("header_rules") or {}).items():
+            if result.get("failed"):
+                keys["failed_rule"].add(rule_id)
+
+    server = findings.get("server_software")
+    if server and server != "Unknown":
+        keys["server"].add(normalize("server", server))
+    for tech in findings.get("technologies") or {}:
+        keys["technology"].add(normalize("technology", tech))
+
+    if geo.get("as"):
+        keys["asn"].add(normalize("asn", geo["as"]))
+    if geo.get("isp"):
+        keys["isp"].add(normalize("isp", geo["isp"]))
+    for domain in data.get("external_connections") or []:
+        keys["domain"].add(normalize("domain", domain))
+
+    return {field: sorted(values) for field, values in keys.items()}
+
+
+class ScanIndex:
+    """Inverted indexes (field -> value -> scan filenames) over the scans folder.
+
+    Entries are appended to a JSONL journal as scans are added or removed, so
+    a restart replays the journal instead of re-reading every report, and the
+    journal is compacted once it holds mostly stale records.
+    """
+
+    def __init__(self, folder, journal_path=None):
+        self.folder = folder
+        self.journal_path = journal_path or os.path.join(folder, '.analytics.jsonl')
+        self.lock = threading.Lock()
+        self.scans = {}
+        self.inverted = {field: defaultdict(set) for field in INDEX_FIELDS}
+        self.journal_records = 0
+        self.folder_mtime = None
+        self.unreadable = {}  # filename -> mtime of reports that failed to parse
+        self._load()
+        self.refresh()
+
+    # --- bookkeeping ---
+
+    def _index(self, filename, entry):
+        self._unindex(filename)
+        self.scans[filename] = entry
+        for field, values in entry["keys"].items():
+            if field in self.inverted:
+                for value in values:
+                    self.inverted[field][value].add(filename)
+
+    def _unindex(self, filename):
+        entry = self.scans.pop(filename, None)
+        if not entry:
+            return
+        for field, values in entry["keys"].items():
+            postings = self.inverted.get(field, {})
+            for value in values:
+                if value in postings:
+                    postings[value].discard(filename)
+                    if not postings[value]:
+                        del postings[value]
+
+    def _load(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+                self.journal_records += 1
+                if record.get("op") == "remove":
+                    self._unindex(record["filename"])
+                else:
+                    self._index(record["filename"], record["entry"])
+
+    def _append(self, records):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        self.journal_records += len(records)
+        if self.journal_records > 2 * len(self.scans) + 1000:
+            self._compact()
+
+    def _compact(self):
+        tmp = self.journal_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for filename, entry in self.scans.items():
+                f.write(json.dumps({"op": "add", "filename": filename, "entry": entry}) + '\n')
+        os.replace(tmp, self.journal_path)
+        self.journal_records = len(self.scans)
+
+    def _entry(self, path, data):
+        return {
+            "version": INDEX_VERSION,
+            "mtime": os.path.getmtime(path),
+            "ip": data.get("target_ip", "N/A"),
+            "date": data.get("scan_start_time", ""),
+            "keys": extract_keys(data),
+        }
+
+    # --- updates ---
+
+    def update(self, filename, data=None):
+        """Index (or re-index) one scan report; data is read from disk if not given."""
+        path = os.path.join(self.folder, filename)
+        try:
+            if data is None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            entry = self._entry(path, data)
+        except Exception:
+            # Retried by refresh() once the file changes (e.g. a writer finishes)
+            try:
+                file_mtime = os.path.getmtime(path)
+            except OSError:
+                file_mtime = None
+            with self.lock:
+                if file_mtime is None:
+                    self.unreadable.pop(filename, None)
+                else:
+                    self.unreadable[filename] = file_mtime
+            return
+        with self.lock:
+            self.unreadable.pop(filename, None)
+            self._index(filename, entry)
+            self._append([{"op": "add", "filename": filename, "entry": entry}])
+
+    def remove(self, filename):
+        with self.lock:
+            self.unreadable.pop(filename, None)
+            if filename in self.scans:
+                self._unindex(filename)
+                self._append([{"op": "remove", "filename": filename}])
+
+    def refresh(self):
+        """Pick up reports written or deleted outside the API (e.g. by the batch CLI).
+
+        Cheap when nothing changed: the folder listing is only walked when the
+        directory mtime moves, and reports that failed to parse are retried
+        when their own mtime moves. The diff is taken under the lock, while
+        reports are parsed outside it.
+        """
+        if not os.path.isdir(self.folder):
+            return
+        mtime = os.stat(self.folder).st_mtime_ns
+        removed, changed = [], []
+        if mtime == self.folder_mtime:
+            with self.lock:
+                retry = list(self.unreadable.items())
+            for filename, seen in retry:
+                try:
+                    file_mtime = os.path.getmtime(os.path.join(self.folder, filename))
+                except OSError:
+                    removed.append(filename)
+                    continue
+                if file_mtime != seen:
+                    changed.append(filename)
+        else:
+            on_disk = {}
+            for item in os.scandir(self.folder):
+                if item.is_file() and item.name.lower().endswith('.json'):
+                    on_disk[item.name] = item.stat().st_mtime
+            with self.lock:
+                self.folder_mtime = mtime
+                removed = [fn for fn in list(self.scans) + list(self.unreadable) if fn not in on_disk]
+                for filename, file_mtime in on_disk.items():
+                    if self.unreadable.get(filename) == file_mtime:
+                        continue
+                    entry = self.scans.get(filename)
+                    if entry is None or entry["mtime"] != file_mtime or entry.get("version") != INDEX_VERSION:
+                        changed.append(filename)
+        for filename in removed:
+            self.remove(filename)
+        for filename in changed:
+            self.update(filename)
+
+    # --- queries ---
+
+    def query(self, filters, limit=100):
+        """Return scans matching every field in filters (values within a field are OR-ed)."""
+        self.refresh()
+        with self.lock:
+            matches = None
+            for field, values in filters.items():
+                postings = self.inverted[field]
+                hits = set()
+                for value in values:
+                    hits |= postings.get(normalize(field, value), set())
+                matches = hits if matches is None else matches & hits
+                if not matches:
+                    break
+            if matches is None:
+                matches = self.scans.keys()
+            newest = heapq.nlargest(limit, matches, key=lambda fn: self.scans[fn]["date"] or '')
+            rows = [{"filename": fn, "ip": self.scans[fn]["ip"], "date": self.scans[fn]["date"]} for fn in newest]
+        return {"total": len(matches), "scans": rows}
+
+    def summary(self, top=20):
+        """Scan counts per indexed value, most common first."""
+        self.refresh()
+        with self.lock:
+            result = {"total_scans": len(self.scans)}
+            for field, postings in self.inverted.items():
+                counts = sorted(((value, len(fns)) for value, fns in postings.items()), key=lambda x: (-x[1], x[0]))
+                result[field] = [{"value": value, "scans": count} for value, count in counts[:top]]
+        return result
@@ -1,7 +1,7 @@
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import socket
 import threading
 import requests
@@ -14,6 +14,7 @@ from urllib.parse import urlparse
 from scrapy.crawler import CrawlerProcess
 from twisted.internet import reactor
 from scraper import scrape_url
+from analytics import ScanIndex, INDEX_FIELDS
 import importlib.util
 import uuid
 import subprocess
@@ -35,11 +36,15 @@ app.add_middleware(
 
 class ScanRequest(BaseModel):
     url: str
+    max_pages: int = Field(1, ge=1, le=1000)
 
 
 # In-memory job store for long-running Scrapy scans
 jobs = {}
 
+# Precomputed cross-scan indexes over the scans/ history corpus
+analytics_index = ScanIndex(os.path.join(os.path.dirname(__file__), 'scans'))
+
 
 # Attempt to load the existing Scrapy-based backend implementation from scans/updated_file.py
 _updated_path = os.path.join(os.path.dirname(__file__), 'scans', 'updated_file.py')
@@ -60,7 +65,7 @@ else:
     supports_fullscan = False
 
 
-def _run_full_scan(job_id: str, user_url: str):
+def _run_full_scan(job_id: str, user_url: str, max_pages: int = 1):
     try:
         if not user_url.startswith('http'):
             user_url = 'https://' + user_url
@@ -98,15 +103,22 @@ def _run_full_scan(job_id: str, user_url: str):
             "findings": { "proxy_detected": "Pending...", "security_header_audit": {} }
         }
 
-        # Run the Scrapy spider in a separate process (scan_worker.py)
+        # Run the Scrapy spider in a separate process (scan_worker.py). The crawl
+        # state is kept per target origin under scans/.jobs (locked while a scan
+        # runs), so a scan that did not complete resumes from its last checkpoint.
         worker_py = os.path.join(os.path.dirname(__file__), 'scan_worker.py')
+        jobdir = os.path.join(folder, '.jobs', updated.jobdir_name(user_url))
         try:
-            subprocess.run([sys.executable, worker_py, user_url, target_filename], check=True, timeout=300)
+            updated.run_crawl_worker([sys.executable, worker_py, user_url, target_filename,
+                                      '--max-pages', str(max_pages)], jobdir, timeout=300)
+        except updated.JobdirBusy:
+            jobs[job_id].update(status='failed', error=f'A scan of {parsed_url.netloc} is already running')
+            return
         except subprocess.CalledProcessError as e:
             jobs[job_id].update(status='failed', error=str(e))
             return
         except subprocess.TimeoutExpired:
-            jobs[job_id].update(status='failed', error='Scan worker timed out')
+            jobs[job_id].update(status='failed', error='Scan worker timed out (progress checkpointed, rerun to resume)')
             return
 
         # Read results and store them
@@ -114,6 +126,7 @@ def _run_full_scan(job_id: str, user_url: str):
             with open(target_filename, 'r') as f:
                 data = json.load(f)
             jobs[job_id].update(status='done', result_path=target_filename, result_data=data)
+            analytics_index.update(os.path.basename(target_filename), data)
         else:
             jobs[job_id].update(status='failed', error='Result file not created')
     except Exception as e:
@@ -130,7 +143,7 @@ async def start_fullscan(request: ScanRequest):
 
     job_id = uuid.uuid4().hex
     jobs[job_id] = {'status': 'running'}
-    thread = threading.Thread(target=_run_full_scan, args=(job_id, request.url), daemon=True)
+    thread = threading.Thread(target=_run_full_scan, args=(job_id, request.url, request.max_pages), daemon=True)
     thread.start()
     return {'job_id': job_id}
 
@@ -196,10 +209,32 @@ async def delete_scan(filename: str):
         return JSONResponse({'error': 'not found'}, status_code=404)
     try:
         os.remove(path)
+        analytics_index.remove(filename)
         return {'status': 'deleted'}
     except Exception as e:
         return JSONResponse({'error': str(e)}, status_code=500)
 
+# Plain def: FastAPI runs these in its threadpool, so a refresh that walks the
+# scans folder or parses new reports never blocks the event loop.
+@app.get('/api/analytics')
+def query_analytics(request: Request, limit: int = 100):
+    """Find stored scans by indexed facts, e.g. ?port=21&port=3306&missing_header=hsts.
+    Repeated values of one field are OR-ed, different fields are AND-ed.
+    Fields: port, missing_header, failed_rule, server, technology, asn, isp, domain.
+    """
+    unknown = [k for k in request.query_params if k not in INDEX_FIELDS and k != 'limit']
+    if unknown:
+        return JSONResponse({'error': f"unknown filter(s): {', '.join(unknown)}"}, status_code=400)
+    filters = {field: request.query_params.getlist(field) for field in INDEX_FIELDS if field in request.query_params}
+    return analytics_index.query(filters, limit=limit)
+
+
+@app.get('/api/analytics/summary')
+def analytics_summary(top: int = 20):
+    """Fleet-wide counts: how many scans have each port, header gap, server, ASN, etc."""
+    return analytics_index.summary(top=top)
+
+
 @app.post("/api/scrape")
 async def scrape_endpoint(request: ScanRequest):
     """Lightweight HTML scrape using requests + BeautifulSoup.
@@ -13,12 +13,16 @@ def load_updated_module():
 
 
 def main():
-    if len(sys.argv) < 3:
-        print('Usage: scan_worker.py <url> <output_path>')
-        sys.exit(2)
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('url')
+    parser.add_argument('output_path')
+    parser.add_argument('--max-pages', type=int, default=1)
+    parser.add_argument('--jobdir')
+    args = parser.parse_args()
 
-    user_url = sys.argv[1]
-    out_path = sys.argv[2]
+    user_url = args.url
+    out_path = args.output_path
 
     updated = load_updated_module()
 
@@ -59,12 +63,11 @@ def main():
     # Run Scrapy in this separate process
     from scrapy.crawler import CrawlerProcess
 
-    process = CrawlerProcess(settings={
-        "LOG_LEVEL": "ERROR",
-        "USER_AGENT": "Mozilla/5.0",
-        "ROBOTSTXT_OBEY": False
-    })
-    process.crawl(updated.SecuritySpider, url=user_url, filename=out_path, audit_metadata=metadata)
+    # With a jobdir the crawl frontier, seen-set and findings are checkpointed
+    # there, and rerunning with the same jobdir resumes the crawl.
+    process = CrawlerProcess(settings=updated.crawl_settings(jobdir=args.jobdir))
+    process.crawl(updated.SecuritySpider, url=user_url, filename=out_path, audit_metadata=metadata,
+                  max_pages=args.max_pages, jobdir=args.jobdir)
     process.start()
 
 
@@ -1,5 +1,6 @@
 import scrapy
 from scrapy.crawler import CrawlerProcess
+from scrapy.dupefilters import BaseDupeFilter
 from bs4 import BeautifulSoup, Comment
 from tabulate import tabulate
 from urllib.parse import urlparse
@@ -10,16 +11,726 @@ import requests
 import re
 import whois
 import threading
+import time
+import sys
+import math
+import signal
+import hashlib
+import shutil
+import heapq
+import io
+from contextlib import contextmanager
+import gzip
+import xml.etree.ElementTree as ET
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+try:
+    import ahocorasick  # optional: pyahocorasick, a C Aho-Corasick automaton
+except ImportError:
+    ahocorasick = None
+
+# --- CONTENT ANALYSIS ---
+
+# Technology fingerprints: name -> (category, literal tokens). Tokens are
+# matched case-insensitively against the response body and a "name: value"
+# header dump, so header signatures are written as e.g. "x-powered-by: express".
+# Body tokens are attribute- or identifier-shaped so prose doesn't match them.
+TECH_SIGNATURES = {
+    "WordPress": ("CMS", ["wp-content/", "wp-includes/", "wp-json"]),
+    "Drupal": ("CMS", ["drupal.settings", "/sites/default/files/", "x-drupal-cache:"]),
+    "Joomla": ("CMS", ["/media/jui/", "joomla!"]),
+    "Shopify": ("CMS", ["cdn.shopify.com", "x-shopid:", "shopify.theme"]),
+    "Wix": ("CMS", ["static.wixstatic.com", "x-wix-request-id:"]),
+    "Squarespace": ("CMS", ["static1.squarespace.com"]),
+    "Magento": ("CMS", ["mage/cookies", "/static/frontend/magento"]),
+    "Ghost": ("CMS", ["ghost-sdk", "content=\"ghost "]),
+    "React": ("JS Framework", ["data-reactroot", "react-dom", "__react"]),
+    "Next.js": ("JS Framework", ["__next_data__", "/_next/static/", "x-nextjs-"]),
+    "Vue.js": ("JS Framework", ["data-v-app", "vue.runtime", "__vue__"]),
+    "Nuxt.js": ("JS Framework", ["__nuxt", "/_nuxt/"]),
+    "Angular": ("JS Framework", ["ng-version=", " ng-app=", " ng-app>", " ng-app ", "data-ng-app"]),
+    "Svelte": ("JS Framework", ["svelte-"]),
+    "jQuery": ("JS Library", ["jquery.min.js", "jquery-"]),
+    "Bootstrap": ("UI Framework", ["bootstrap.min.css", "bootstrap.min.js"]),
+    "Tailwind CSS": ("UI Framework", ["cdn.tailwindcss.com", "tailwind.min.css"]),
+    "Express": ("Web Framework", ["x-powered-by: express"]),
+    "ASP.NET": ("Web Framework", ["x-aspnet-version:", "__viewstate", "x-powered-by: asp.net"]),
+    "PHP": ("Language", ["x-powered-by: php", "phpsessid"]),
+    "Django": ("Web Framework", ["csrfmiddlewaretoken", "csrftoken=", "__admin_media_prefix__"]),
+    "Ruby on Rails": ("Web Framework", ["csrf-param", "x-runtime:"]),
+    "Laravel": ("Web Framework", ["laravel_session"]),
+    "Cloudflare": ("CDN", ["cf-ray:", "server: cloudflare", "cdnjs.cloudflare.com"]),
+    "CloudFront": ("CDN", ["x-amz-cf-id:", "server: cloudfront"]),
+    "Akamai": ("CDN", ["x-akamai-", "akamaihd.net"]),
+    "Fastly": ("CDN", ["x-fastly-", "fastly-debug"]),
+    "jsDelivr": ("CDN", ["cdn.jsdelivr.net"]),
+    "unpkg": ("CDN", ["unpkg.com/"]),
+    "Google Analytics": ("Analytics", ["google-analytics.com", "gtag(", "googletagmanager.com"]),
+    "Hotjar": ("Analytics", ["static.hotjar.com"]),
+    "Nginx": ("Web Server", ["server: nginx"]),
+    "Apache": ("Web Server", ["server: apache"]),
+    "Microsoft IIS": ("Web Server", ["server: microsoft-iis"]),
+}
+
+# Inline secret / API key patterns: label -> (anchors, pattern). Anchors are
+# lowercase literal prefixes that join the fingerprint tokens in the single
+# scan; the pattern is only tried, anchored, where one of them was found. If
+# the pattern has a capture group, only that group is reported as the value.
+SECRET_PATTERNS = {
+    "AWS Access Key": (["akia"], r"AKIA[0-9A-Z]{16}"),
+    "Google API Key": (["aiza"], r"AIza[0-9A-Za-z_\-]{35}"),
+    "GitHub Token": (["ghp_", "gho_", "ghu_", "ghs_", "ghr_"], r"gh[pousr]_[0-9A-Za-z]{36}"),
+    "Slack Token": (["xoxb-", "xoxa-", "xoxp-", "xoxr-", "xoxs-"], r"xox[baprs]-[0-9A-Za-z\-]{10,48}"),
+    "Stripe Live Key": (["sk_live_", "rk_live_"], r"[sr]k_live_[0-9A-Za-z]{24,99}"),
+    "Private Key Block": (["-----begin "], r"-----BEGIN (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----"),
+    "JWT": (["eyj"], r"eyJ[0-9A-Za-z_\-]{8,}\.eyJ[0-9A-Za-z_\-]{8,}\.[0-9A-Za-z_\-]{8,}"),
+    "Generic API Key": (["apikey", "api_key", "api-key", "secret", "access_token", "access-token"],
+                        r"(?i:api[_-]?key|secret|access[_-]?token)[\"']?\s*[:=]\s*[\"']([0-9A-Za-z_\-]{16,64})[\"']"),
+}
+
+
+def _trie_regex(tokens):
+    """Build a prefix-factored regex from literal tokens.
+
+    A flat alternation retries every token at every offset; factoring the
+    tokens into a trie bounds the work per offset by the longest token, so
+    scan cost stays linear in page size however large the database grows.
+    """
+    trie = {}
+    for token in tokens:
+        node = trie
+        for ch in token:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        optional = "" in node
+        body = branches[0] if len(branches) == 1 and not optional else "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+
+    return build(trie)
+
+
+class ContentAnalyzer:
+    """Single-pass matcher for technology fingerprints and inline secrets.
+
+    Fingerprint tokens and secret anchors are compiled into one trie regex
+    that runs over the ASCII-lowercased bytes of a page (bytes.lower() keeps
+    offsets intact, so secret patterns can be verified on the original).
+    The trie sits in a zero-width lookahead, so every offset is tried and
+    matches may overlap; the longest token found at an offset is expanded to
+    all tokens that are its prefixes, so none of them is shadowed.
+
+    When pyahocorasick is installed it replaces the regex: an Aho-Corasick
+    automaton reports every (overlapping) token at a per-byte cost that does
+    not depend on the size of the signature table.
+    """
+
+    def __init__(self, signatures=None, secret_patterns=None, use_automaton=True):
+        signatures = TECH_SIGNATURES if signatures is None else signatures
+        secret_patterns = SECRET_PATTERNS if secret_patterns is None else secret_patterns
+
+        # token -> list of ("tech", name, category) / ("secret", label, compiled pattern)
+        self.token_map = {}
+        for name, (category, tokens) in signatures.items():
+            for token in tokens:
+                self.token_map.setdefault(token.lower().encode(), []).append(("tech", name, category))
+        for label, (anchors, pattern) in secret_patterns.items():
+            compiled = re.compile(pattern.encode())
+            for anchor in anchors:
+                self.token_map.setdefault(anchor.lower().encode(), []).append(("secret", label, compiled))
+
+        # token -> entries of every token that is a prefix of it (itself included)
+        self.prefix_hits = {}
+        for token in self.token_map:
+            self.prefix_hits[token] = [entry for size in range(1, len(token) + 1)
+                                       for entry in self.token_map.get(token[:size], ())]
+
+        tokens = [t.decode("latin-1") for t in self.token_map]
+        self.matcher = re.compile(b"(?=(" + _trie_regex(tokens).encode("latin-1") + b"))") if tokens else None
+        self.automaton = None
+        if use_automaton and ahocorasick is not None and tokens:
+            self.automaton = ahocorasick.Automaton()
+            for token in tokens:
+                self.automaton.add_word(token, (len(token), self.token_map[token.encode("latin-1")]))
+            self.automaton.make_automaton()
+
+    def iter_hits(self, lowered):
+        """Yield (start offset, entries) for every token occurrence in lowered bytes."""
+        if self.automaton is not None:
+            for end, (size, entries) in self.automaton.iter(lowered.decode("latin-1")):
+                yield end - size + 1, entries
+        else:
+            for m in self.matcher.finditer(lowered):
+                yield m.start(), self.prefix_hits[m.group(1)]
+
+    def scan(self, data):
+        """Return ({tech_name: category}, [(secret_label, value), ...]) for one bytes/str blob."""
+        technologies, secrets = {}, []
+        if not self.matcher or not data:
+            return technologies, secrets
+        if isinstance(data, str):
+            data = data.encode("utf-8", errors="ignore")
+        for start, entries in self.iter_hits(data.lower()):
+            for kind, name, extra in entries:
+                if kind == "tech":
+                    technologies[name] = extra
+                else:
+                    hit = extra.match(data, start)
+                    if hit:
+                        value = hit.group(1) if extra.groups else hit.group()
+                        secrets.append((name, value.decode("utf-8", errors="replace")))
+        return technologies, secrets
+
+    def analyze(self, body, headers):
+        """Scan a response body and its headers (dict), one pass each."""
+        header_text = "\n".join(f"{k}: {v}" for k, v in headers.items())
+        technologies, secrets = self.scan(header_text)
+        body_tech, body_secrets = self.scan(body)
+        technologies.update(body_tech)
+        return technologies, secrets + body_secrets
+
+
+def redact_secret(value):
+    return value if len(value) <= 12 else f"{value[:4]}...{value[-4:]}"
+
+
+def benchmark_content_analyzer(size_mb=8, rounds=3, analyzer=None):
+    """Measure analyzer throughput in MB/s on a synthetic HTML page.
+
+    Usage (from the repository root):
+        python -c "import sys; sys.path.insert(0, 'scans'); import updated_file; print(updated_file.benchmark_content_analyzer())"
+    """
+    analyzer = analyzer or CONTENT_ANALYZER
+    chunk = (b'<div class="item"><a href="/page">Link</a><script src="/static/app.js"></script>'
+             b'<!-- build 1234 --><p>Lorem ipsum dolor sit amet, consectetur adipiscing.</p></div>\n')
+    page = chunk * max(1, int(size_mb * 1024 * 1024 / len(chunk)))
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        analyzer.scan(page)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(len(page) / (1024 * 1024) / best, 2)
+
+
+CONTENT_ANALYZER = ContentAnalyzer()
+
+# --- HEADER RULES ---
+
+# Declarative security-header rules. Each rule names the header it inspects and
+# a check kind from RULE_CHECKS; extra keys are that check's parameters.
+HEADER_RULES = [
+    {"id": "hsts-present", "header": "strict-transport-security", "check": "present",
+     "description": "Strict-Transport-Security is set"},
+    {"id": "hsts-max-age", "header": "strict-transport-security", "check": "hsts_max_age", "min": 15552000,
+     "description": "HSTS max-age is at least 180 days"},
+    {"id": "hsts-include-subdomains", "header": "strict-transport-security", "check": "has_token",
+     "token": "includesubdomains", "description": "HSTS covers subdomains"},
+    {"id": "hsts-preload", "header": "strict-transport-security", "check": "has_token", "token": "preload",
+     "description": "HSTS is preload-eligible"},
+    {"id": "csp-present", "header": "content-security-policy", "check": "present",
+     "description": "Content-Security-Policy is set"},
+    {"id": "csp-no-unsafe-inline", "header": "content-security-policy", "check": "csp_lacks",
+     "directive": "script-src", "source": "'unsafe-inline'", "description": "CSP script-src disallows 'unsafe-inline'"},
+    {"id": "csp-no-unsafe-eval", "header": "content-security-policy", "check": "csp_lacks",
+     "directive": "script-src", "source": "'unsafe-eval'", "description": "CSP script-src disallows 'unsafe-eval'"},
+    {"id": "csp-no-wildcard-script", "header": "content-security-policy", "check": "csp_lacks",
+     "directive": "script-src", "source": "*", "description": "CSP script-src has no wildcard source"},
+    {"id": "csp-object-src", "header": "content-security-policy", "check": "csp_directive",
+     "directive": "object-src", "description": "CSP restricts object-src"},
+    {"id": "csp-frame-ancestors", "header": "content-security-policy", "check": "csp_directive",
+     "directive": "frame-ancestors", "fallback": False, "description": "CSP sets frame-ancestors"},
+    {"id": "x-frame-options", "header": "x-frame-options", "check": "one_of", "values": ["deny", "sameorigin"],
+     "description": "X-Frame-Options is DENY or SAMEORIGIN"},
+    {"id": "x-content-type-options", "header": "x-content-type-options", "check": "one_of", "values": ["nosniff"],
+     "description": "X-Content-Type-Options is nosniff"},
+    {"id": "referrer-policy", "header": "referrer-policy", "check": "one_of",
+     "values": ["no-referrer", "same-origin", "strict-origin", "strict-origin-when-cross-origin"],
+     "known": ["no-referrer", "no-referrer-when-downgrade", "origin", "origin-when-cross-origin", "same-origin",
+               "strict-origin", "strict-origin-when-cross-origin", "unsafe-url"],
+     "description": "Referrer-Policy does not leak full URLs cross-origin"},
+    {"id": "permissions-policy", "header": "permissions-policy", "check": "present",
+     "description": "Permissions-Policy is set"},
+    {"id": "cookie-secure", "header": "set-cookie", "check": "cookie_flag", "flag": "secure",
+     "description": "All cookies are Secure"},
+    {"id": "cookie-httponly", "header": "set-cookie", "check": "cookie_flag", "flag": "httponly",
+     "description": "All cookies are HttpOnly"},
+    {"id": "cookie-samesite", "header": "set-cookie", "check": "cookie_flag", "flag": "samesite",
+     "description": "All cookies set SameSite"},
+]
+
+
+def parse_csp(value):
+    directives = {}
+    for part in value.split(";"):
+        tokens = part.strip().lower().split()
+        if tokens and tokens[0] not in directives:
+            directives[tokens[0]] = tokens[1:]
+    return directives
+
+
+def _check_present(rule):
+    return lambda values: bool(values)
+
+
+def _check_hsts_max_age(rule):
+    def check(values):
+        if not values:
+            return False
+        m = re.search(r"max-age\s*=\s*\"?(\d+)", values[0], re.I)
+        return bool(m) and int(m.group(1)) >= rule["min"]
+    return check
+
+
+def _check_has_token(rule):
+    def check(values):
+        if not values:
+            return None
+        return rule["token"] in [t.strip().lower() for t in values[0].split(";")]
+    return check
+
+
+def _check_one_of(rule):
+    allowed = set(rule["values"])
+    known = set(rule.get("known", ()))
+    def check(values):
+        if not values:
+            return False
+        # Referrer-Policy may list fallbacks; the last recognised value wins.
+        tokens = [t.strip().lower() for t in values[0].split(",")]
+        if known:
+            tokens = [t for t in tokens if t in known]
+        return bool(tokens) and tokens[-1] in allowed
+    return check
+
+
+def _check_csp_lacks(rule):
+    def check(values):
+        if not values:
+            return None
+        directives = parse_csp(values[0])
+        sources = directives.get(rule["directive"], directives.get("default-src"))
+        if sources is None:
+            return False  # neither the directive nor default-src: nothing is restricted
+        if rule["source"] == "*":
+            # Scheme-only sources (https:, data:) allow any host just like "*"
+            return not any(s == "*" or re.fullmatch(r"[a-z][a-z0-9+.\-]*:", s) for s in sources)
+        return rule["source"] not in sources
+    return check
+
+
+def _check_csp_directive(rule):
+    def check(values):
+        if not values:
+            return None
+        directives = parse_csp(values[0])
+        return rule["directive"] in directives or (rule.get("fallback", True) and "default-src" in directives)
+    return check
+
+
+def cookie_attributes(cookie):
+    """Sorted lowercase attribute names of one Set-Cookie value (name=value excluded)."""
+    return tuple(sorted(a.strip().split("=")[0].lower() for a in cookie.split(";")[1:]))
+
+
+def _check_cookie_flag(rule):
+    def check(values):
+        if not values:
+            return None
+        return all(rule["flag"] in cookie_attributes(cookie) for cookie in values)
+    return check
+
+
+RULE_CHECKS = {
+    "present": _check_present,
+    "hsts_max_age": _check_hsts_max_age,
+    "has_token": _check_has_token,
+    "one_of": _check_one_of,
+    "csp_lacks": _check_csp_lacks,
+    "csp_directive": _check_csp_directive,
+    "cookie_flag": _check_cookie_flag,
+}
+
+
+class HeaderRuleEngine:
+    """Compiles HEADER_RULES once and evaluates them per distinct header set.
+
+    Only the headers the rules reference are hashed, so pages that differ just
+    in Date/ETag/etc. share one cached evaluation. Cookies are keyed by their
+    attribute names, since per-response session values never repeat.
+    """
+
+    def __init__(self, rules=None, cache_size=10000):
+        self.rules = HEADER_RULES if rules is None else rules
+        self.checks = [(rule["id"], rule["header"], RULE_CHECKS[rule["check"]](rule)) for rule in self.rules]
+        self.relevant = sorted({rule["header"] for rule in self.rules})
+        self.cache = {}
+        self.cache_size = cache_size
+
+    def evaluate(self, headers):
+        """headers: lowercase name -> list of values. Returns ((rule_id, result), ...)."""
+        key = tuple(tuple(map(cookie_attributes, headers.get(name, ()))) if name == "set-cookie"
+                    else tuple(headers.get(name, ())) for name in self.relevant)
+        results = self.cache.get(key)
+        if results is None:
+            results = tuple((rule_id, check(headers.get(name, []))) for rule_id, name, check in self.checks)
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            self.cache[key] = results
+        return results
+
+    def empty_summary(self):
+        return {rule["id"]: {"description": rule["description"], "passed": 0, "failed": 0,
+                             "not_applicable": 0, "failing_urls": []} for rule in self.rules}
+
+    @staticmethod
+    def aggregate(summary, results, url, max_examples=5):
+        for rule_id, result in results:
+            entry = summary[rule_id]
+            if result is None:
+                entry["not_applicable"] += 1
+            elif result:
+                entry["passed"] += 1
+            else:
+                entry["failed"] += 1
+                if len(entry["failing_urls"]) < max_examples:
+                    entry["failing_urls"].append(url)
+
+
+HEADER_RULE_ENGINE = HeaderRuleEngine()
+
+
+# --- CRAWL STATE ---
+
+class BloomFilter:
+    """Fixed-size Bloom filter backed by a bytearray, optionally persisted to disk.
+
+    Sized for `capacity` items at `error_rate` false positives (about 1.8 MB for
+    a million URLs at 0.1%), so memory stays flat however large the site is.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001, path=None):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.path = path
+        self.bits = bytearray((self.size + 7) // 8)
+        if path and os.path.exists(path) and os.path.getsize(path) == len(self.bits):
+            with open(path, 'rb') as f:
+                self.bits = bytearray(f.read())
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item):
+        """Add item; return True if it was (probably) not present before."""
+        added = False
+        for p in self._positions(item):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                self.bits[p >> 3] |= mask
+                added = True
+        return added
+
+    def save(self):
+        if self.path:
+            _atomic_write(self.path, bytes(self.bits))
+
+
+def _atomic_write(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class UrlStore:
+    """Seen-set of URLs. A plain set by default; with a path, membership goes
+    through a BloomFilter and URLs are appended to a text file, so a crawl of
+    a very large site neither holds every URL in memory nor loses them on restart.
+    """
+
+    def __init__(self, path=None, capacity=1000000):
+        self.path = path
+        if path is None:
+            self.urls = set()
+            return
+        self.bloom = BloomFilter(capacity, path=path + '.bloom')
+        self.count = 0
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self.bloom.add(line.rstrip('\n'))
+                    self.count += 1
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def add(self, url):
+        if self.path is None:
+            if url in self.urls:
+                return False
+            self.urls.add(url)
+            return True
+        if not self.bloom.add(url):
+            return False
+        self.file.write(url + '\n')
+        self.count += 1
+        return True
+
+    def __contains__(self, url):
+        return url in (self.urls if self.path is None else self.bloom)
+
+    def __len__(self):
+        return len(self.urls) if self.path is None else self.count
+
+    def __iter__(self):
+        if self.path is None:
+            return iter(self.urls)
+        self.file.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return iter([line.rstrip('\n') for line in f])
+
+    def checkpoint(self):
+        if self.path is not None:
+            self.file.flush()
+            self.bloom.save()
+
+    def close(self):
+        if self.path is not None:
+            self.checkpoint()
+            self.file.close()
+
+
+class BloomDupeFilter(BaseDupeFilter):
+    """Scrapy dupefilter keeping request fingerprints in a BloomFilter stored in JOBDIR."""
+
+    def __init__(self, path=None, capacity=1000000, fingerprinter=None):
+        self.bloom = BloomFilter(capacity, path=path)
+        self.fingerprinter = fingerprinter
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        jobdir = crawler.settings.get('JOBDIR')
+        path = os.path.join(jobdir, 'requests.bloom') if jobdir else None
+        return cls(path, crawler.settings.getint('BLOOM_CAPACITY', 1000000), crawler.request_fingerprinter)
+
+    def request_seen(self, request):
+        return not self.bloom.add(self.fingerprinter.fingerprint(request).hex())
+
+    def close(self, reason):
+        self.bloom.save()
+
+
+def crawl_settings(user_agent="Mozilla/5.0", jobdir=None):
+    """CrawlerProcess settings; with a jobdir the frontier and seen-set live on disk."""
+    settings = {
+        "LOG_LEVEL": "ERROR",
+        "USER_AGENT": user_agent,
+        "ROBOTSTXT_OBEY": False # Set to False for educational research on sites that block spiders
+    }
+    if jobdir:
+        os.makedirs(jobdir, exist_ok=True)
+        settings.update({
+            "JOBDIR": jobdir,
+            "DUPEFILTER_CLASS": BloomDupeFilter,
+            "SCHEDULER_DISK_QUEUE": "scrapy.squeues.PickleFifoDiskQueue",
+            "SCHEDULER_MEMORY_QUEUE": "scrapy.squeues.FifoMemoryQueue",
+        })
+    return settings
+
+
+# An unfinished jobdir is resumed unless it has been idle for this long
+RESUME_MAX_AGE = 24 * 3600
+
+
+def jobdir_name(url):
+    """Per-target jobdir name: readable host plus a hash of scheme://host:port,
+    so targets that differ only in port or scheme never share crawl state."""
+    parsed = urlparse(url)
+    origin = f"{parsed.scheme}://{parsed.netloc}".lower()
+    host = (parsed.hostname or "target").replace('.', '_')
+    return f"{host}_{hashlib.sha1(origin.encode()).hexdigest()[:10]}"
+
+
+class JobdirBusy(RuntimeError):
+    pass
+
+
+@contextmanager
+def jobdir_lock(jobdir):
+    """Exclusive, non-blocking lock on a crawl jobdir, held for the whole scan.
+
+    Raises JobdirBusy if another scan (in this or another process) holds it.
+    The OS drops the lock when its holder dies, so a killed scan never leaves
+    a host locked.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(jobdir)), exist_ok=True)
+    with open(jobdir + '.lock', 'a+') as f:
+        try:
+            if os.name == 'nt':
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            raise JobdirBusy(f"a scan using {jobdir} is already running")
+        yield
+
+
+def prepare_jobdir(jobdir):
+    """Keep a jobdir whose crawl never completed (timeout, crash, killed worker
+    or API restart) unless it went stale; otherwise start clean.
+
+    Returns True when the next crawl will resume.
+    """
+    if not os.path.isdir(jobdir):
+        return False
+    completed = os.path.exists(os.path.join(jobdir, 'completed'))
+    # Checkpoints replace files in the jobdir, so its mtime tracks the last progress
+    if not completed and time.time() - os.path.getmtime(jobdir) < RESUME_MAX_AGE:
+        return True
+    shutil.rmtree(jobdir, ignore_errors=True)
+    return False
+
+
+def run_crawl_worker(cmd, jobdir, timeout):
+    """run_worker() for a resumable crawl: lock the jobdir, resume whatever an
+    earlier run left unfinished, and clear it once a crawl completes."""
+    with jobdir_lock(jobdir):
+        prepare_jobdir(jobdir)
+        run_worker(cmd + ['--jobdir', jobdir], timeout)
+        # The spider marks the jobdir once its report is written; a worker that
+        # exited cleanly after an outside SIGINT keeps its progress instead.
+        if os.path.exists(os.path.join(jobdir, 'completed')):
+            shutil.rmtree(jobdir, ignore_errors=True)
+
+
+def stop_worker(proc):
+    # SIGINT lets Scrapy shut down cleanly and persist its JOBDIR queue.
+    if os.name == 'nt':
+        proc.terminate()
+    else:
+        proc.send_signal(signal.SIGINT)
+
+
+def run_worker(cmd, timeout, grace=30):
+    """Run a scan_worker.py command like subprocess.run(check=True, timeout=...).
+
+    On timeout the worker is asked to stop gracefully so a resumable crawl keeps
+    its progress, and is only killed if it does not exit within `grace` seconds.
+    """
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        _, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        stop_worker(proc)
+        try:
+            proc.communicate(timeout=grace)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+        raise
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+
+# --- SITEMAP DISCOVERY ---
+
+def parse_robots_txt(text):
+    """Return (sitemap URLs, disallowed paths) from a robots.txt body."""
+    sitemaps, disallow = [], []
+    for line in text.splitlines():
+        field, _, value = line.split('#', 1)[0].partition(':')
+        field, value = field.strip().lower(), value.strip()
+        if field == 'sitemap' and value:
+            sitemaps.append(value)
+        elif field == 'disallow' and value and value not in disallow:
+            disallow.append(value)
+    return sitemaps, disallow
+
+
+def iter_sitemap(body):
+    """Stream (kind, loc, lastmod, priority) entries from a sitemap or sitemap index.
+
+    kind is "sitemap" for index entries and "url" for pages. The XML (gunzipped
+    on the fly when needed) is parsed with iterparse and each entry is cleared
+    once read, so memory stays constant for sitemaps with hundreds of
+    thousands of URLs.
+    """
+    stream = io.BytesIO(body)
+    if body[:2] == b'\x1f\x8b':
+        stream = gzip.GzipFile(fileobj=stream)
+    root = None
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if root is None:
+            root = elem
+        if event != 'end':
+            continue
+        kind = elem.tag.rsplit('}', 1)[-1]
+        if kind in ('url', 'sitemap'):
+            fields = {child.tag.rsplit('}', 1)[-1]: (child.text or '').strip() for child in elem}
+            if fields.get('loc'):
+                yield kind, fields['loc'], fields.get('lastmod'), fields.get('priority')
+            root.clear()
+
+
+def sitemap_priority(priority=None, lastmod=None):
+    """Map sitemap <priority>/<lastmod> to a Scrapy request priority (higher is crawled first)."""
+    try:
+        score = float(priority) if priority else 0.5
+    except ValueError:
+        score = 0.5
+    score = int(min(max(score, 0.0), 1.0) * 100)
+    if lastmod:
+        try:
+            # Pages changed within the last year get a boost; a future lastmod counts as today
+            age_days = max(0, (datetime.now() - datetime.fromisoformat(lastmod[:10])).days)
+            score += max(0, 50 - age_days // 7)
+        except ValueError:
+            pass
+    return score
+
+
+# Crawl-derived parts of final_data that are checkpointed and restored on resume
+CHECKPOINT_KEYS = ("findings", "external_connections", "robots_txt", "sitemap_discovery")
+
+# Bounds on sitemap discovery, so every scan stays well inside the worker timeout
+SITEMAP_MAX_FILES = 20
+SITEMAP_MAX_URLS = 50000
+
+
 class SecuritySpider(scrapy.Spider):
     name = "security_spider"
     
-    def __init__(self, url=None, filename=None, audit_metadata=None, *args, **kwargs):
+    def __init__(self, url=None, filename=None, audit_metadata=None, max_pages=1, jobdir=None,
+                 checkpoint_every=25, max_sitemap_files=SITEMAP_MAX_FILES, max_sitemap_urls=SITEMAP_MAX_URLS,
+                 *args, **kwargs):
         super(SecuritySpider, self).__init__(*args, **kwargs)
         self.start_urls = [url]
         self.target_domain = urlparse(url).netloc
         self.output_file = filename
+        self.max_pages = int(max_pages)
+        self.checkpoint_every = int(checkpoint_every)
+        self.max_sitemap_files = int(max_sitemap_files)
+        self.max_sitemap_urls = int(max_sitemap_urls)
+        self.jobdir = jobdir
+        self.checkpoint_file = os.path.join(jobdir, 'findings.json') if jobdir else None
+        self.navigation_file = os.path.join(jobdir, 'navigation.jsonl') if jobdir else None
         
         self.final_data = audit_metadata or {}
         self.final_data["findings"] = {
@@ -28,63 +739,257 @@ class SecuritySpider(scrapy.Spider):
             "operating_system": "Unknown",
             "comments": [],
             "proxy_detected": "No Proxy Found",
-            "security_header_audit": {} 
+            "security_header_audit": {},
+            "technologies": {},
+            "secrets": [],
+            "header_rules": HEADER_RULE_ENGINE.empty_summary()
         }
-        self.final_data["sub_urls"] = set()
         self.final_data["external_connections"] = set()
         self.final_data["navigation_map"] = []
+        self.final_data["robots_txt"] = {"sitemaps": [], "disallow": []}
+        self.final_data["sitemap_discovery"] = {"sitemaps_fetched": 0, "truncated": False}
+        self.pages_crawled = 0
+        self.pages_scheduled = 1
+
+        # Resume the crawl-derived state of an interrupted job; the host metadata
+        # (IP, ports, geo, whois) just collected by the worker is kept as is.
+        if self.checkpoint_file and os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file, 'r') as f:
+                saved = json.load(f)
+            self.pages_crawled = saved.get("pages_crawled", 0)
+            self.pages_scheduled = saved.get("pages_scheduled", 1)
+            for key in CHECKPOINT_KEYS:
+                if key in saved:
+                    self.final_data[key] = saved[key]
+            self.final_data["external_connections"] = set(self.final_data["external_connections"])
+
+        self.seen_comments = {c["comment"] for c in self.final_data["findings"]["comments"]}
+        self.seen_secrets = {(s["type"], s["value"]) for s in self.final_data["findings"]["secrets"]}
+        self.final_data["sub_urls"] = UrlStore(os.path.join(jobdir, 'sub_urls.txt') if jobdir else None)
+        self.final_data["sitemap_urls"] = UrlStore(os.path.join(jobdir, 'sitemap_urls.txt') if jobdir else None)
+        self.navigation_log = open(self.navigation_file, 'a', encoding='utf-8') if jobdir else None
+
+        # Until robots.txt and every sitemap are read, sitemap pages and links
+        # compete for the max_pages budget in one bounded min-heap by priority.
+        self.robots_pending = True
+        self.sitemaps_seen = set()
+        self.sitemaps_pending = 0
+        self.candidates = []
+        self.candidate_sequence = 0
+        self.offered_links = set()
+
+    async def start(self):
+        # Scrapy >= 2.13 entry point; older versions call start_requests() directly
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        # The entry page goes first and is tagged: the header snapshot describes it
+        yield scrapy.Request(self.start_urls[0], callback=self.parse, priority=300, dont_filter=True,
+                             meta={"start_page": True})
+        # robots.txt next: its Sitemap: lines seed the frontier with deep pages
+        parsed = urlparse(self.start_urls[0])
+        yield scrapy.Request(f"{parsed.scheme}://{parsed.netloc}/robots.txt", callback=self.parse_robots,
+                             errback=self.robots_failed, priority=200, dont_filter=True,
+                             meta={"handle_httpstatus_all": True})
+
+    def parse_robots(self, response):
+        self.robots_pending = False
+        sitemaps, disallow = [], []
+        if response.status == 200 and isinstance(response, scrapy.http.TextResponse):
+            sitemaps, disallow = parse_robots_txt(response.text)
+        robots = self.final_data["robots_txt"]
+        robots["sitemaps"] = sitemaps
+        robots["disallow"] = disallow
+        for sitemap_url in sitemaps or [response.urljoin('/sitemap.xml')]:
+            yield from self.request_sitemap(sitemap_url)
+        yield from self.schedule_candidates()
+
+    def robots_failed(self, failure):
+        self.robots_pending = False
+        yield from self.schedule_candidates()
+
+    def request_sitemap(self, url):
+        if url in self.sitemaps_seen:
+            return
+        if len(self.sitemaps_seen) >= self.max_sitemap_files:
+            self.final_data["sitemap_discovery"]["truncated"] = True
+            return
+        self.sitemaps_seen.add(url)
+        self.sitemaps_pending += 1
+        yield scrapy.Request(url, callback=self.parse_sitemap, errback=self.sitemap_failed, priority=150,
+                             dont_filter=True, meta={"handle_httpstatus_all": True})
+
+    def parse_sitemap(self, response):
+        self.sitemaps_pending -= 1
+        urls = self.final_data["sitemap_urls"]
+        discovery = self.final_data["sitemap_discovery"]
+        if response.status == 200:
+            discovery["sitemaps_fetched"] += 1
+            try:
+                for kind, loc, lastmod, priority in iter_sitemap(response.body):
+                    if urlparse(loc).netloc != self.target_domain:
+                        continue
+                    if kind == "sitemap":
+                        yield from self.request_sitemap(loc)
+                        continue
+                    if len(urls) >= self.max_sitemap_urls:
+                        discovery["truncated"] = True
+                        break
+                    urls.add(loc)
+                    self.offer_page(loc, sitemap_priority(priority, lastmod))
+            except (ET.ParseError, OSError, EOFError) as e:
+                self.logger.warning(f"Unreadable sitemap {response.url}: {e}")
+        yield from self.schedule_candidates()
+
+    def sitemap_failed(self, failure):
+        self.sitemaps_pending -= 1
+        yield from self.schedule_candidates()
+
+    def discovering(self):
+        """True until robots.txt and every sitemap it leads to have been read."""
+        return self.robots_pending or self.sitemaps_pending > 0
+
+    def offer_page(self, url, score, link=False):
+        # Ties keep the earlier entry, so discovery order breaks equal priorities
+        self.candidate_sequence += 1
+        dropped = (score, -self.candidate_sequence, url, link)
+        if len(self.candidates) < self.max_pages - 1:
+            heapq.heappush(self.candidates, dropped)
+            dropped = None
+        elif self.candidates and dropped > self.candidates[0]:
+            dropped = heapq.heapreplace(self.candidates, dropped)
+        if dropped and dropped[3]:
+            self.final_data["sub_urls"].add(dropped[2])  # a discovered page, just not crawled
+
+    def schedule_candidates(self):
+        """Once discovery is over, crawl the best candidates the budget still allows."""
+        if self.discovering():
+            return
+        candidates, self.candidates = self.candidates, []
+        for score, _, url, link in sorted(candidates, reverse=True):
+            if self.pages_scheduled < self.max_pages and self.final_data["sub_urls"].add(url):
+                self.pages_scheduled += 1
+                yield scrapy.Request(url, callback=self.parse, priority=score)
+            elif link:
+                self.final_data["sub_urls"].add(url)
 
     def parse(self, response):
+        if not isinstance(response, scrapy.http.TextResponse):
+            return
         soup = BeautifulSoup(response.text, 'html.parser')
         self.final_data["sub_urls"].add(response.url)
-        
+        self.pages_crawled += 1
+
         # Capture headers and decode them
         resp_headers = {k.decode('utf-8'): v[0].decode('utf-8') for k, v in response.headers.items()}
-        self.final_data["findings"]["http_headers"] = resp_headers
-        
-        # --- NEW LOGIC: Case-Insensitive Security Header Audit ---
-        # Convert all keys to lowercase to catch 'content-security-policy' or 'Content-Security-Policy'
         headers_lower = {k.lower(): v for k, v in resp_headers.items()}
-        
-        hsts = headers_lower.get('strict-transport-security', 'MISSING')
-        csp = headers_lower.get('content-security-policy', 'MISSING')
-        
-        self.final_data["findings"]["security_header_audit"] = {
-            "Strict-Transport-Security": hsts,
-            "Content-Security-Policy": csp
-        }
-        
-        # Debug print to see keys in your terminal during execution
-        # print(f"[*] DEBUG - Available Headers for {response.url}: {list(headers_lower.keys())}")
+
+        # http_headers, the server fingerprint and the HSTS/CSP snapshot describe
+        # the entry page; the crawl-wide view lives in findings["header_rules"].
+        if response.meta.get("start_page"):
+            self.final_data["findings"]["http_headers"] = resp_headers
+            self.final_data["findings"]["security_header_audit"] = {
+                "Strict-Transport-Security": headers_lower.get('strict-transport-security', 'MISSING'),
+                "Content-Security-Policy": headers_lower.get('content-security-policy', 'MISSING')
+            }
+            server_header = headers_lower.get('server', '')
+            os_match = re.search(r'\((.*?)\)', server_header)
+            self.final_data["findings"]["operating_system"] = os_match.group(1) if os_match else "Hidden"
+            self.final_data["findings"]["server_software"] = re.sub(r'\s\(.*?\)', '', server_header).strip() or "Unknown"
+
+        header_values = {k.decode('utf-8').lower(): [v.decode('utf-8', errors='replace') for v in vals]
+                         for k, vals in response.headers.items()}
+        HEADER_RULE_ENGINE.aggregate(self.final_data["findings"]["header_rules"],
+                                     HEADER_RULE_ENGINE.evaluate(header_values), response.url)
 
         proxy_headers = ['via', 'x-forwarded-for', 'cf-ray', 'forwarded']
         detected = [h for h in proxy_headers if h in headers_lower]
         if detected or "cloudflare" in headers_lower.get('server', ''):
             self.final_data["findings"]["proxy_detected"] = f"Proxy Detected ({', '.join(detected) if detected else 'WAF'})"
 
-        server_header = headers_lower.get('server', '')
-        os_match = re.search(r'\((.*?)\)', server_header)
-        self.final_data["findings"]["operating_system"] = os_match.group(1) if os_match else "Hidden"
-        self.final_data["findings"]["server_software"] = re.sub(r'\s\(.*?\)', '', server_header).strip() or "Unknown"
+        self.analyze_content(response, soup, resp_headers)
 
         for a in soup.find_all('a', href=True):
             link = response.urljoin(a['href'])
             link_domain = urlparse(link).netloc
             
-            self.final_data["navigation_map"].append({
+            self.record_navigation({
                 "from": response.url, "to": link, "text": a.get_text().strip() or "[Internal Link]"
             })
 
             if link_domain == self.target_domain:
-                self.final_data["sub_urls"].add(link)
+                if self.discovering():
+                    # Ranked against sitemap pages as an entry without <priority>/<lastmod>
+                    if link not in self.final_data["sub_urls"] and link not in self.offered_links:
+                        self.offered_links.add(link)
+                        self.offer_page(link, sitemap_priority(), link=True)
+                elif self.final_data["sub_urls"].add(link) and self.pages_scheduled < self.max_pages:
+                    self.pages_scheduled += 1
+                    yield response.follow(link, callback=self.parse)
             elif link_domain:
                 self.final_data["external_connections"].add(link_domain)
 
+        if self.checkpoint_file and self.pages_crawled % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def record_navigation(self, route):
+        if self.navigation_log:
+            self.navigation_log.write(json.dumps(route) + '\n')
+        else:
+            self.final_data["navigation_map"].append(route)
+
+    def analyze_content(self, response, soup, resp_headers):
+        findings = self.final_data["findings"]
+
+        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+            text = comment.strip()
+            if text and text not in self.seen_comments:
+                self.seen_comments.add(text)
+                findings["comments"].append({"url": response.url, "comment": text})
+
+        technologies, secrets = CONTENT_ANALYZER.analyze(response.body, resp_headers)
+        findings["technologies"].update(technologies)
+        for label, value in secrets:
+            value = redact_secret(value)
+            if (label, value) in self.seen_secrets:
+                continue
+            self.seen_secrets.add((label, value))
+            findings["secrets"].append({"type": label, "value": value, "url": response.url})
+
+    def checkpoint(self):
+        """Persist aggregated findings so an interrupted job can resume from here."""
+        self.final_data["sub_urls"].checkpoint()
+        self.navigation_log.flush()
+        self.final_data["sitemap_urls"].checkpoint()
+        state = {k: self.final_data[k] for k in CHECKPOINT_KEYS}
+        state["external_connections"] = sorted(state["external_connections"])
+        state["pages_crawled"] = self.pages_crawled
+        state["pages_scheduled"] = self.pages_scheduled
+        _atomic_write(self.checkpoint_file, json.dumps(state, default=str).encode('utf-8'))
+
     def closed(self, reason):
-        self.final_data["sub_urls"] = sorted(list(self.final_data["sub_urls"]))
+        if self.checkpoint_file:
+            self.checkpoint()
+            self.navigation_log.close()
+        # An interrupted crawl (timeout/SIGINT, reason 'shutdown') is not a result:
+        # its progress is in the jobdir checkpoint, and the run that finishes writes the report.
+        if reason != 'finished':
+            for key in ("sub_urls", "sitemap_urls"):
+                self.final_data[key].close()
+            return
+        if self.checkpoint_file:
+            with open(self.navigation_file, 'r', encoding='utf-8') as f:
+                self.final_data["navigation_map"] = [json.loads(line) for line in f]
+        for key in ("sub_urls", "sitemap_urls"):
+            store = self.final_data[key]
+            self.final_data[key] = sorted(store)
+            store.close()
         self.final_data["external_connections"] = sorted(list(self.final_data["external_connections"]))
-        with open(self.output_file, 'w') as f:
-            json.dump(self.final_data, f, indent=4, default=str)
+        # Written atomically: readers such as the analytics index never see a partial report
+        _atomic_write(self.output_file, json.dumps(self.final_data, indent=4, default=str).encode('utf-8'))
+        if self.jobdir:
+            open(os.path.join(self.jobdir, 'completed'), 'w').close()
 
 # --- HELPERS ---
 
@@ -138,6 +1043,45 @@ def get_whois_data(domain):
 
 # --- MAIN ENGINE ---
 
+def build_summary_table(data, scan_end_dt, target_filename):
+    # --- NEW LOGIC: Robust, Case-Insensitive Audit ---
+    header_audit = data.get("findings", {}).get("security_header_audit", {})
+    
+    hsts_val = header_audit.get("Strict-Transport-Security", "MISSING")
+    csp_val = header_audit.get("Content-Security-Policy", "MISSING")
+
+    hsts_status = "PRESENT" if hsts_val != "MISSING" else "MISSING"
+    csp_status = "PRESENT" if csp_val != "MISSING" else "MISSING"
+
+    sum_table = [
+        ["Metric", "Reconnaissance Details"],
+        ["Scan Start Time", data.get("scan_start_time")],
+        ["Scan End Time", scan_end_dt],
+        ["Target IP", data["target_ip"]],
+        ["Target Port", data["target_port"]],
+        ["Server Software", data["findings"].get("server_software", "Unknown")],
+        ["Operating System", data["findings"].get("operating_system", "Unknown")],
+        ["VPN Software Info", data.get("vpn_status", "No VPN Server Found")],
+        ["HSTS Header", hsts_status],
+        ["CSP Header", csp_status],
+        ["Header Rules Failing", ", ".join(rule_id for rule_id, r in data["findings"].get("header_rules", {}).items() if r["failed"]) or "None"],
+        ["ISP / Org", f"{data['geo_intel'].get('isp', 'N/A')} / {data['geo_intel'].get('organization', 'N/A')}"] ,
+        ["ASN Details", data["geo_intel"].get("as", "N/A")],
+        ["Created", data["domain_dates"].get("created", "N/A")],
+        ["Open Ports", ", ".join([str(p['port']) for p in data['open_ports']]) if data.get('open_ports') else "None Detected"],
+        ["HTTP Headers Found", len(data["findings"].get("http_headers", {}))],
+        ["Proxy Status", data["findings"].get("proxy_detected", "No Proxy Found")],
+        ["Technologies", ", ".join(sorted(data["findings"].get("technologies", {}))) or "None Detected"],
+        ["HTML Comments", len(data["findings"].get("comments", []))],
+        ["Exposed Secrets", len(data["findings"].get("secrets", []))],
+        ["Internal Pages", len(data.get("sub_urls", []))],
+        ["Sitemap URLs", len(data.get("sitemap_urls", []))],
+        ["External URLs", len(data.get("external_connections", []))],
+        ["Navigation Routes", len(data.get("navigation_map", []))],
+        ["Report Saved", target_filename]
+    ]
+    return sum_table
+
 def run_audit():
     print("\n" + "="*75)
     print("  STRATEGIC RECONNAISSANCE TOOL: DETAILED SUMMARY MODE")
@@ -180,11 +1124,8 @@ def run_audit():
         "scan_start_time": scan_start_dt 
     }
 
-    process = CrawlerProcess(settings={
-        "LOG_LEVEL": "ERROR", 
-        "USER_AGENT": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-        "ROBOTSTXT_OBEY": False # Set to False for educational research on sites that block spiders
-    })
+    process = CrawlerProcess(settings=crawl_settings(
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"))
     process.crawl(SecuritySpider, url=user_url, filename=target_filename, audit_metadata=metadata)
     process.start()
 
@@ -194,40 +1135,150 @@ def run_audit():
         with open(target_filename, 'r') as f:
             data = json.load(f)
         
-        # --- NEW LOGIC: Robust, Case-Insensitive Audit ---
-        header_audit = data.get("findings", {}).get("security_header_audit", {})
-        
-        hsts_val = header_audit.get("Strict-Transport-Security", "MISSING")
-        csp_val = header_audit.get("Content-Security-Policy", "MISSING")
-
-        hsts_status = "PRESENT" if hsts_val != "MISSING" else "MISSING"
-        csp_status = "PRESENT" if csp_val != "MISSING" else "MISSING"
-
-        sum_table = [
-            ["Metric", "Reconnaissance Details"],
-            ["Scan Start Time", data.get("scan_start_time")],
-            ["Scan End Time", scan_end_dt],
-            ["Target IP", data["target_ip"]],
-            ["Target Port", data["target_port"]],
-            ["Server Software", data["findings"].get("server_software", "Unknown")],
-            ["Operating System", data["findings"].get("operating_system", "Unknown")],
-            ["VPN Software Info", data.get("vpn_status", "No VPN Server Found")],
-            ["HSTS Header", hsts_status],
-            ["CSP Header", csp_status],
-            ["ISP / Org", f"{data['geo_intel'].get('isp', 'N/A')} / {data['geo_intel'].get('organization', 'N/A')}"] ,
-            ["ASN Details", data["geo_intel"].get("as", "N/A")],
-            ["Created", data["domain_dates"].get("created", "N/A")],
-            ["Open Ports", ", ".join([str(p['port']) for p in data['open_ports']]) if data.get('open_ports') else "None Detected"],
-            ["HTTP Headers Found", len(data["findings"].get("http_headers", {}))],
-            ["Proxy Status", data["findings"].get("proxy_detected", "No Proxy Found")],
-            ["Internal Pages", len(data.get("sub_urls", []))],
-            ["External URLs", len(data.get("external_connections", []))],
-            ["Navigation Routes", len(data.get("navigation_map", []))],
-            ["Report Saved", target_filename]
-        ]
+        sum_table = build_summary_table(data, scan_end_dt, target_filename)
         print("\n" + tabulate(sum_table, headers="firstrow", tablefmt="fancy_grid"))
     else:
         print("\n[!] Error: Scan results could not be generated.")
 
+# --- BATCH MODE ---
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scan_worker.py')
+
+
+def summarize_result(data):
+    findings = data.get("findings", {})
+    return {
+        "target_ip": data.get("target_ip"),
+        "open_ports": [p['port'] for p in data.get("open_ports", [])],
+        "server_software": findings.get("server_software", "Unknown"),
+        "proxy_detected": findings.get("proxy_detected", "No Proxy Found"),
+        "technologies": sorted(findings.get("technologies", {})),
+        "header_rules_failed": [rule_id for rule_id, r in findings.get("header_rules", {}).items() if r["failed"]],
+        "secrets_found": len(findings.get("secrets", [])),
+        "internal_pages": len(data.get("sub_urls", [])),
+        "sitemap_urls": len(data.get("sitemap_urls", [])),
+    }
+
+
+def scan_target(user_url, folder, timeout, index, max_pages=1, jobs_dir=None):
+    """Run one full audit in a scan_worker.py subprocess and return a JSONL record.
+
+    With jobs_dir, each target origin gets a persistent JOBDIR there, so a scan
+    that did not complete resumes from its last checkpoint on the next run.
+    """
+    if not user_url.startswith("http"): user_url = "https://" + user_url
+    hostname = urlparse(user_url).netloc.split(':')[0]
+    domain_clean = hostname.replace('.', '_')
+    target_filename = os.path.join(folder, f"{domain_clean}_{datetime.now().strftime('%H%M%S')}_{index}.json")
+    cmd = [sys.executable, WORKER_SCRIPT, user_url, target_filename, "--max-pages", str(max_pages)]
+    jobdir = os.path.join(jobs_dir, jobdir_name(user_url)) if jobs_dir else None
+
+    record = {"target": user_url, "status": "failed", "report": None, "error": None}
+    started = time.perf_counter()
+    try:
+        if jobdir:
+            run_crawl_worker(cmd, jobdir, timeout)
+        else:
+            run_worker(cmd, timeout)
+        if not os.path.exists(target_filename):
+            record["error"] = "Result file not created"
+        else:
+            with open(target_filename, 'r') as f:
+                data = json.load(f)
+            record.update(summarize_result(data), report=target_filename)
+            if data.get("target_ip") == "Resolution Failed":
+                record["error"] = "Resolution Failed"
+            elif not data.get("findings", {}).get("http_headers"):
+                # Connection refused, TLS failure, 4xx/5xx: the entry page was never parsed
+                record["error"] = "Target page could not be fetched"
+            else:
+                record["status"] = "ok"
+    except subprocess.CalledProcessError as e:
+        stderr = (e.stderr or b'').decode(errors='ignore').strip().splitlines()
+        record["error"] = stderr[-1] if stderr else str(e)
+    except subprocess.TimeoutExpired:
+        record["error"] = "Scan worker timed out" + (" (progress checkpointed, rerun to resume)" if jobdir else "")
+    except Exception as e:
+        record["error"] = str(e)
+    record["duration_s"] = round(time.perf_counter() - started, 2)
+    return record
+
+
+def parse_target_lines(lines):
+    targets = []
+    for line in lines:
+        targets.extend(line.split('#', 1)[0].split())
+    return targets
+
+
+def read_targets(args):
+    targets = list(args.targets)
+    if args.file:
+        with args.file as stream:
+            targets.extend(parse_target_lines(stream))
+    elif not targets and not sys.stdin.isatty():
+        targets.extend(parse_target_lines(sys.stdin))
+    return targets
+
+
+def run_batch(targets, workers=4, timeout=300, summary=False, folder="scans", max_pages=1, jobs_dir=None):
+    """Audit targets in parallel, streaming one JSONL line per finished target.
+
+    Returns the process exit code: 0 if every target succeeded, 1 otherwise.
+    """
+    if not os.path.exists(folder): os.makedirs(folder)
+    records = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(scan_target, url, folder, timeout, i, max_pages, jobs_dir) for i, url in enumerate(targets)]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            if not summary:
+                print(json.dumps(record, default=str), flush=True)
+
+    if summary:
+        table = [["Target", "Status", "Target IP", "Open Ports", "Server Software", "Failing Header Rules", "Report / Error"]]
+        for r in sorted(records, key=lambda r: r["target"]):
+            table.append([
+                r["target"], r["status"].upper(), r.get("target_ip") or "N/A",
+                ", ".join(map(str, r.get("open_ports", []))) or "None",
+                r.get("server_software") or "Unknown", len(r.get("header_rules_failed", [])),
+                r["error"] or r["report"],
+            ])
+        print(tabulate(table, headers="firstrow", tablefmt="fancy_grid"))
+
+    failed = sum(1 for r in records if r["status"] != "ok")
+    if failed:
+        print(f"[!] {failed}/{len(records)} targets failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Strategic reconnaissance audit. Runs interactively when no targets are given.")
+    parser.add_argument("targets", nargs="*", help="URLs or hostnames to audit")
+    parser.add_argument("-f", "--file", type=argparse.FileType('r'), help="read targets from FILE, one or more per line, '#' starts a comment ('-' for stdin)")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="parallel scan workers (default: 4)")
+    parser.add_argument("-t", "--timeout", type=int, default=300, help="per-target timeout in seconds (default: 300)")
+    parser.add_argument("-o", "--output-dir", default="scans", help="directory for JSON reports (default: scans)")
+    parser.add_argument("-p", "--max-pages", type=int, default=1, help="internal pages to crawl per target (default: 1)")
+    parser.add_argument("--jobs-dir", help="keep a resumable crawl state per target under this directory")
+    parser.add_argument("--summary", action="store_true", help="print a summary table instead of JSONL lines")
+    args = parser.parse_args(argv)
+    if args.max_pages < 1:
+        parser.error("--max-pages must be at least 1")
+
+    if not args.targets and not args.file and sys.stdin.isatty():
+        run_audit()
+        return 0
+
+    targets = read_targets(args)
+    if not targets:
+        print("[!] Error: no targets given.", file=sys.stderr)
+        return 2
+    return run_batch(targets, workers=args.workers, timeout=args.timeout,
+                     summary=args.summary, folder=args.output_dir, max_pages=args.max_pages, jobs_dir=args.jobs_dir)
+
+
 if __name__ == "__main__":
-    run_audit()
+    sys.exit(main())
@@ -0,0 +1,19 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# Top-level modules (analytics.py, scraper.py) are imported from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def updated():
+    """scans/updated_file.py, loaded the same way main.py and scan_worker.py load it."""
+    pytest.importorskip("scrapy")
+    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'scans', 'updated_file.py')
+    spec = importlib.util.spec_from_file_location('updated_file', path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+
+from analytics import ScanIndex, extract_keys
+
+
+def report(ip="1.2.3.4", ports=(21,), headers=True):
+    return {
+        "target_ip": ip,
+        "scan_start_time": "2026-10-19 08:00:00",
+        "open_ports": [{"port": p} for p in ports],
+        "geo_intel": {"as": "AS16509 Amazon.com, Inc.", "isp": "Amazon"},
+        "findings": {
+            "http_headers": {"Server": "nginx"} if headers else {},
+            "server_software": "nginx" if headers else "Unknown",
+            "security_header_audit": {"Strict-Transport-Security": "MISSING", "Content-Security-Policy": "x"}
+                                     if headers else {},
+        },
+    }
+
+
+def test_scans_without_a_fetched_page_have_no_header_keys():
+    assert "missing_header" not in extract_keys(report(ip="Resolution Failed", ports=()))
+    assert "missing_header" not in extract_keys(report(headers=False))
+    assert extract_keys(report())["missing_header"] == ["strict-transport-security"]
+
+
+def test_queries(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps(report(ports=(21, 443))))
+    (tmp_path / "b.json").write_text(json.dumps(report(ports=(3306,))))
+    (tmp_path / "c.json").write_text(json.dumps(report(ip="Resolution Failed", ports=(), headers=False)))
+    index = ScanIndex(str(tmp_path))
+
+    assert index.query({"port": ["21", "3306"]})["total"] == 2
+    assert index.query({"port": ["443"], "missing_header": ["hsts"]})["total"] == 1
+    assert index.query({"missing_header": ["hsts"]})["total"] == 2
+    assert index.query({"asn": ["16509"]})["total"] == 3
+
+    os.remove(tmp_path / "a.json")
+    index.remove("a.json")
+    assert ScanIndex(str(tmp_path)).query({"port": ["21"]})["total"] == 0  # journal replay
+
+
+def test_half_written_report_is_indexed_once_complete(tmp_path):
+    index = ScanIndex(str(tmp_path))
+    path = tmp_path / "a.json"
+    path.write_text(json.dumps(report())[:40])
+    assert index.query({"port": ["21"]})["total"] == 0
+
+    path.write_text(json.dumps(report()))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert index.query({"port": ["21"]})["total"] == 1
+
+
+def test_refresh_is_safe_alongside_updates(tmp_path):
+    index = ScanIndex(str(tmp_path))
+    errors = []
+
+    def write(start):
+        for i in range(start, start + 100):
+            name = f"{i}.json"
+            (tmp_path / name).write_text(json.dumps(report()))
+            index.update(name)
+
+    def read():
+        try:
+            for _ in range(100):
+                index.query({"port": ["21"]})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n * 100,)) for n in range(3)]
+    threads += [threading.Thread(target=read) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert index.query({"port": ["21"]})["total"] == 300
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+FAKE_WORKER = """
+import json, sys
+url, out = sys.argv[1], sys.argv[2]
+headers = {} if "down" in url else {"Server": "nginx"}
+json.dump({"target_ip": "1.2.3.4", "open_ports": [], "findings": {"http_headers": headers}}, open(out, "w"))
+"""
+
+
+@pytest.fixture
+def fake_worker(updated, tmp_path, monkeypatch):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    monkeypatch.setattr(updated, "WORKER_SCRIPT", str(script))
+
+
+def test_missing_target_file_is_a_usage_error(updated, tmp_path):
+    with pytest.raises(SystemExit) as exc:
+        updated.main(["-f", str(tmp_path / "missing.txt")])
+    assert exc.value.code == 2
+
+
+def test_unreachable_page_counts_as_failure(updated, fake_worker, tmp_path, capsys):
+    targets = tmp_path / "targets.txt"
+    targets.write_text("up.example.com  # comment\n# skipped.example.com\ndown.example.com\n")
+    code = updated.main(["-f", str(targets), "-o", str(tmp_path / "out")])
+
+    records = {r["target"]: r for r in map(json.loads, capsys.readouterr().out.splitlines())}
+    assert code == 1
+    assert records["https://up.example.com"]["status"] == "ok"
+    assert records["https://down.example.com"]["status"] == "failed"
+    assert "https://skipped.example.com" not in records
@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+def test_resume_keeps_fresh_metadata(updated, tmp_path):
+    jobdir = str(tmp_path / "job")
+    os.makedirs(jobdir)
+    with open(os.path.join(jobdir, "findings.json"), "w") as f:
+        json.dump({"target_ip": "10.0.0.1", "open_ports": [{"port": 21}],
+                   "findings": {"comments": [{"url": "u", "comment": "old"}], "secrets": []},
+                   "external_connections": ["cdn.example"], "robots_txt": {"sitemaps": [], "disallow": []},
+                   "pages_crawled": 7, "pages_scheduled": 9}, f)
+
+    spider = updated.SecuritySpider(url="https://example.com", filename=str(tmp_path / "out.json"),
+                                    audit_metadata={"target_ip": "1.2.3.4", "open_ports": []}, jobdir=jobdir)
+    assert spider.final_data["target_ip"] == "1.2.3.4"
+    assert spider.final_data["open_ports"] == []
+    assert spider.final_data["external_connections"] == {"cdn.example"}
+    assert spider.seen_comments == {"old"}
+    assert (spider.pages_crawled, spider.pages_scheduled) == (7, 9)
+
+
+def test_unfinished_jobdirs_are_resumed(updated, tmp_path):
+    jobdir = str(tmp_path / "job")
+    assert updated.prepare_jobdir(jobdir) is False
+
+    # Timed out, crashed or killed: whatever the worker left behind is resumed
+    slow = [sys.executable, "-c", "import time; time.sleep(30)"]
+    with pytest.raises(subprocess.TimeoutExpired):
+        updated.run_crawl_worker(slow, jobdir, timeout=0.5)
+    os.makedirs(jobdir, exist_ok=True)
+    assert updated.prepare_jobdir(jobdir) is True
+    crashed = [sys.executable, "-c", "import os; os._exit(137)"]
+    with pytest.raises(subprocess.CalledProcessError):
+        updated.run_crawl_worker(crashed, jobdir, timeout=5)
+    assert updated.prepare_jobdir(jobdir) is True
+
+    # ... unless it went stale
+    stale = time.time() - updated.RESUME_MAX_AGE - 60
+    os.utime(jobdir, (stale, stale))
+    assert updated.prepare_jobdir(jobdir) is False
+    assert not os.path.exists(jobdir)
+
+    # A clean exit without the spider's completed marker keeps the state too
+    os.makedirs(jobdir)
+    updated.run_crawl_worker([sys.executable, "-c", "pass"], jobdir, timeout=5)
+    assert os.path.isdir(jobdir)
+    completes = [sys.executable, "-c", "import os, sys; open(os.path.join(sys.argv[2], 'completed'), 'w').close()"]
+    updated.run_crawl_worker(completes, jobdir, timeout=5)
+    assert not os.path.exists(jobdir)
+
+
+def test_interrupted_crawl_writes_no_report(updated, tmp_path):
+    jobdir = str(tmp_path / "job")
+    os.makedirs(jobdir)
+    out = tmp_path / "out.json"
+    spider = updated.SecuritySpider(url="https://example.com", filename=str(out), jobdir=jobdir)
+    spider.final_data["external_connections"].add("cdn.example")
+    spider.closed("shutdown")
+    assert not out.exists()
+    assert not os.path.exists(os.path.join(jobdir, "completed"))
+    with open(os.path.join(jobdir, "findings.json")) as f:
+        assert json.load(f)["external_connections"] == ["cdn.example"]
+
+    spider = updated.SecuritySpider(url="https://example.com", filename=str(out), jobdir=jobdir)
+    spider.closed("finished")
+    assert json.loads(out.read_text())["external_connections"] == ["cdn.example"]
+    assert os.path.exists(os.path.join(jobdir, "completed"))
+
+
+def test_jobdir_name_separates_ports_and_schemes(updated):
+    names = {updated.jobdir_name(u) for u in
+             ["https://example.com", "https://example.com:8443", "http://example.com", "https://Example.com/x"]}
+    assert len(names) == 3
+    assert all(name.startswith("example_com_") for name in names)
+
+
+def test_jobdir_lock_rejects_concurrent_scans(updated, tmp_path):
+    jobdir = str(tmp_path / "job")
+    with updated.jobdir_lock(jobdir):
+        with pytest.raises(updated.JobdirBusy):
+            with updated.jobdir_lock(jobdir):
+                pass
+    with updated.jobdir_lock(jobdir):
+        pass
@@ -0,0 +1,101 @@
+import pytest
+
+
+def results(updated, headers):
+    return dict(updated.HeaderRuleEngine().evaluate(headers))
+
+
+def test_parse_csp_keeps_first_directive(updated):
+    assert updated.parse_csp("Script-Src 'self'; script-src *; object-src 'none';") == {
+        "script-src": ["'self'"], "object-src": ["'none'"]}
+
+
+@pytest.mark.parametrize("csp, inline, wildcard", [
+    ("default-src 'self'", True, True),
+    ("default-src 'self' 'unsafe-inline'", False, True),
+    ("default-src *; script-src 'self'", True, True),
+    ("script-src https: data:", True, False),
+    ("script-src 'self' *", True, False),
+    ("frame-ancestors 'none'", False, False),
+])
+def test_csp_source_rules_fall_back_to_default_src(updated, csp, inline, wildcard):
+    r = results(updated, {"content-security-policy": [csp]})
+    assert r["csp-no-unsafe-inline"] is inline
+    assert r["csp-no-unsafe-eval"] is (inline or "unsafe-inline" in csp)
+    assert r["csp-no-wildcard-script"] is wildcard
+
+
+def test_csp_directive_fallback(updated):
+    r = results(updated, {"content-security-policy": ["default-src 'none'"]})
+    assert r["csp-object-src"] is True
+    assert r["csp-frame-ancestors"] is False  # frame-ancestors does not fall back
+
+
+@pytest.mark.parametrize("hsts, max_age, subdomains, preload", [
+    ("max-age=31536000; includeSubDomains; preload", True, True, True),
+    ('max-age="15552000"', True, False, False),
+    ("max-age=86400; Preload", False, False, True),
+    ("includeSubDomains", False, True, False),
+])
+def test_hsts(updated, hsts, max_age, subdomains, preload):
+    r = results(updated, {"strict-transport-security": [hsts]})
+    assert (r["hsts-present"], r["hsts-max-age"], r["hsts-include-subdomains"], r["hsts-preload"]) == \
+        (True, max_age, subdomains, preload)
+
+
+def test_missing_headers(updated):
+    r = results(updated, {})
+    assert r["hsts-present"] is False and r["hsts-max-age"] is False
+    assert r["hsts-preload"] is None and r["csp-no-unsafe-inline"] is None and r["cookie-secure"] is None
+
+
+def test_referrer_policy_last_recognised_value_wins(updated):
+    assert results(updated, {"referrer-policy": ["unsafe-url, no-referrer"]})["referrer-policy"] is True
+    assert results(updated, {"referrer-policy": ["no-referrer, foo-bar"]})["referrer-policy"] is True
+    assert results(updated, {"referrer-policy": ["no-referrer, unsafe-url"]})["referrer-policy"] is False
+    assert results(updated, {"referrer-policy": ["foo-bar"]})["referrer-policy"] is False
+
+
+def test_cookie_flags_require_every_cookie(updated):
+    r = results(updated, {"set-cookie": ["a=1; Secure; HttpOnly; SameSite=Lax", "b=2; secure; Path=/"]})
+    assert (r["cookie-secure"], r["cookie-httponly"], r["cookie-samesite"]) == (True, False, False)
+
+
+def test_cache_ignores_irrelevant_headers_and_cookie_values(updated):
+    engine = updated.HeaderRuleEngine()
+    for i in range(3):
+        engine.evaluate({"date": [f"day {i}"], "x-frame-options": ["DENY"],
+                         "set-cookie": [f"session={i}; Secure; HttpOnly"]})
+    assert len(engine.cache) == 1
+    engine.evaluate({"x-frame-options": ["DENY"], "set-cookie": ["session=9; Secure"]})
+    assert len(engine.cache) == 2
+
+
+def test_aggregate_counts_per_rule(updated):
+    engine = updated.HeaderRuleEngine()
+    summary = engine.empty_summary()
+    pages = {
+        "https://e.com/": {"x-frame-options": ["DENY"], "set-cookie": ["s=1; Secure"]},
+        "https://e.com/a": {"x-frame-options": ["ALLOWALL"]},
+        "https://e.com/b": {},
+    }
+    for url, headers in pages.items():
+        engine.aggregate(summary, engine.evaluate(headers), url, max_examples=1)
+    xfo = summary["x-frame-options"]
+    assert (xfo["passed"], xfo["failed"], xfo["not_applicable"]) == (1, 2, 0)
+    assert xfo["failing_urls"] == ["https://e.com/a"]
+    cookie = summary["cookie-secure"]
+    assert (cookie["passed"], cookie["failed"], cookie["not_applicable"]) == (1, 0, 2)
+
+
+def test_server_fingerprint_comes_from_the_entry_page(updated, tmp_path):
+    from scrapy.http import HtmlResponse, Request
+
+    spider = updated.SecuritySpider(url="https://example.com/", filename=str(tmp_path / "out.json"), max_pages=2)
+    for url, meta, headers in [("https://example.com/", {"start_page": True}, {"Server": "Apache/2.4 (Ubuntu)"}),
+                               ("https://example.com/a", {}, {})]:
+        response = HtmlResponse(url, body=b"<html></html>", headers=headers, request=Request(url, meta=meta))
+        list(spider.parse(response))
+    findings = spider.final_data["findings"]
+    assert (findings["server_software"], findings["operating_system"]) == ("Apache/2.4", "Ubuntu")
+    assert findings["header_rules"]["x-frame-options"]["failed"] == 2
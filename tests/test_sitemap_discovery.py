@@ -0,0 +1,60 @@
+import gzip
+
+
+def make_spider(updated, tmp_path, **kwargs):
+    return updated.SecuritySpider(url="https://example.com/", filename=str(tmp_path / "out.json"), **kwargs)
+
+
+def test_iter_sitemap_reads_gzipped_index_and_urlset(updated):
+    urlset = (b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+              b'<url><loc>https://example.com/a</loc><lastmod>2026-01-01</lastmod><priority>0.8</priority></url>'
+              b'</urlset>')
+    index = b'<sitemapindex><sitemap><loc>https://example.com/s.xml.gz</loc></sitemap></sitemapindex>'
+    assert list(updated.iter_sitemap(gzip.compress(urlset))) == [("url", "https://example.com/a", "2026-01-01", "0.8")]
+    assert list(updated.iter_sitemap(index)) == [("sitemap", "https://example.com/s.xml.gz", None, None)]
+
+
+def test_budget_goes_to_highest_priority_pages(updated, tmp_path):
+    spider = make_spider(updated, tmp_path, max_pages=3)
+    spider.robots_pending = False
+    spider.sitemaps_pending = 1
+    for i, score in enumerate([10, 90, 50, 90, 20]):
+        spider.offer_page(f"https://example.com/p{i}", score)
+    assert len(spider.candidates) == 2
+    assert list(spider.schedule_candidates()) == []  # a sitemap is still pending
+
+    spider.sitemaps_pending = 0
+    scheduled = [r.url for r in spider.schedule_candidates()]
+    assert scheduled == ["https://example.com/p1", "https://example.com/p3"]
+    assert sorted(spider.final_data["sub_urls"]) == scheduled
+
+
+def test_links_and_sitemap_pages_share_the_budget(updated, tmp_path):
+    from scrapy.http import HtmlResponse, Request, TextResponse
+
+    spider = make_spider(updated, tmp_path, max_pages=3)
+    page = b'<a href="/a">a</a><a href="/b">b</a><a href="/c">c</a>'
+    start = HtmlResponse("https://example.com/", body=page, request=Request("https://example.com/"))
+    assert list(spider.parse(start)) == []  # links wait for discovery
+
+    robots = TextResponse("https://example.com/robots.txt", body=b"Sitemap: https://example.com/s.xml")
+    assert [r.url for r in spider.parse_robots(robots)] == ["https://example.com/s.xml"]
+    sitemap = TextResponse("https://example.com/s.xml", body=(
+        b'<urlset><url><loc>https://example.com/deep</loc><priority>0.9</priority></url>'
+        b'<url><loc>https://example.com/old</loc><priority>0.1</priority></url></urlset>'))
+    scheduled = [r.url for r in spider.parse_sitemap(sitemap)]
+    assert scheduled == ["https://example.com/deep", "https://example.com/a"]
+    # Links that lost are still recorded as discovered; losing sitemap pages are not
+    assert set(spider.final_data["sub_urls"]) == {"https://example.com/" + p for p in ("", "deep", "a", "b", "c")}
+
+
+def test_future_lastmod_is_not_boosted_past_today(updated):
+    today = updated.datetime.now().strftime("%Y-%m-%d")
+    assert updated.sitemap_priority("0.1", "2099-01-01") == updated.sitemap_priority("0.1", today) == 60
+
+
+def test_sitemap_files_are_capped(updated, tmp_path):
+    spider = make_spider(updated, tmp_path, max_pages=5, max_sitemap_files=2)
+    requests = [r for i in range(4) for r in spider.request_sitemap(f"https://example.com/s{i}.xml")]
+    assert len(requests) == 2
+    assert spider.final_data["sitemap_discovery"]["truncated"] is True